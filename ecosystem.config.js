@@ -1,8 +1,37 @@
+const fs = require('fs');
 const os = require('os');
+const path = require('path');
 
 const cpus = os.cpus().length;
 const prodInstances = Math.max(2, cpus - 1);
 
+/**
+ * Values from .env, which ConfigModule loads inside the API. The Python
+ * verifier is started by PM2 rather than by Node, so anything it needs from
+ * .env has to be passed through its `env` explicitly.
+ */
+function loadDotEnv() {
+  try {
+    const dotenv = require('dotenv');
+    return dotenv.parse(fs.readFileSync(path.join(__dirname, '.env')));
+  } catch {
+    return {};
+  }
+}
+
+const dotEnv = loadDotEnv();
+
+/** Same precedence as ConfigModule: real environment first, then .env */
+const fromEnv = (key) => process.env[key] ?? dotEnv[key];
+
+/** Drop unset keys so PM2 does not export them as the string "undefined" */
+const definedOnly = (env) =>
+  Object.fromEntries(Object.entries(env).filter(([, v]) => v !== undefined));
+
+const verifierSocket = (environment) =>
+  fromEnv('GOOGLE_PLAY_VERIFIER_SOCKET') ||
+  `/tmp/storytime-gplay-${environment}.sock`;
+
 const baseConfig = {
   script: 'dist/src/main.js',
   instances: 'max',
@@ -12,29 +41,45 @@ const baseConfig = {
   max_memory_restart: '1G',
 };
 
+const apiApp = (environment, overrides = {}) => ({
+  ...baseConfig,
+  name: `storytime-api-${environment}`,
+  ...overrides,
+  env: {
+    NODE_ENV: environment,
+    GOOGLE_PLAY_VERIFIER_SOCKET: verifierSocket(environment),
+  },
+});
+
+/** Long-lived Google Play verifier shared by one environment's API instances */
+const verifierApp = (environment) => ({
+  name: `storytime-gplay-verifier-${environment}`,
+  script: 'scripts/verify_google_purchase.py',
+  args: 'serve',
+  interpreter: fromEnv('PYTHON_PATH') || 'scripts/.venv/bin/python3',
+  instances: 1,
+  exec_mode: 'fork',
+  autorestart: true,
+  watch: false,
+  max_memory_restart: '256M',
+  // Longer than JOB_DRAIN_TIMEOUT so queued cancels finish before SIGKILL
+  kill_timeout: 15000,
+  env: definedOnly({
+    GOOGLE_PLAY_VERIFIER_SOCKET: verifierSocket(environment),
+    GOOGLE_WIF_PROVIDER: fromEnv('GOOGLE_WIF_PROVIDER'),
+    GOOGLE_SERVICE_ACCOUNT_EMAIL: fromEnv('GOOGLE_SERVICE_ACCOUNT_EMAIL'),
+    AWS_REGION: fromEnv('AWS_REGION'),
+    AWS_DEFAULT_REGION: fromEnv('AWS_DEFAULT_REGION'),
+  }),
+});
+
 module.exports = {
   apps: [
-    {
-      ...baseConfig,
-      name: 'storytime-api-development',
-      env: {
-        NODE_ENV: 'development',
-      },
-    },
-    {
-      ...baseConfig,
-      name: 'storytime-api-staging',
-      env: {
-        NODE_ENV: 'staging',
-      },
-    },
-    {
-      ...baseConfig,
-      name: 'storytime-api-production',
-      instances: prodInstances,
-      env: {
-        NODE_ENV: 'production',
-      },
-    },
+    apiApp('development'),
+    apiApp('staging'),
+    apiApp('production', { instances: prodInstances }),
+    verifierApp('development'),
+    verifierApp('staging'),
+    verifierApp('production'),
   ],
 };
@@ -1,39 +1,172 @@
 #!/usr/bin/env python3
 """
 Python script to verify Google Play purchases using WIF
-Called by Node.js backend as a subprocess
+Runs as a long-lived daemon on a Unix socket (``serve``) that the Node.js
+backend talks to over HTTP; the one-shot CLI is kept as a fallback.
 """
 import sys
 import os
-import json
-from google.auth import aws
-from google.auth.transport.requests import Request
+import signal
+import socket
+import asyncio
+import datetime
+import threading
+import time
+import concurrent.futures
+import http.client
+import uuid
+import httpx
+import orjson
+from cachetools import TTLCache
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-def _get_credentials():
-    """Get authenticated Google credentials using WIF"""
+SOCKET_PATH = os.environ.get("GOOGLE_PLAY_VERIFIER_SOCKET", "/tmp/gplay.sock")
+
+# Shared session for the credential path only: IMDS and token exchange
+# (STS/IAM) calls reuse pooled keep-alive connections (and TLS sessions)
+# across calls in the daemon. Android Publisher calls go through the httpx
+# client below, which retries verify GETs itself (see _get_with_retry).
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=32,
+    max_retries=Retry(
+        total=2,
+        backoff_factor=0.2,
+        status_forcelist=[429, 500, 502, 503, 504],
+        raise_on_status=False,
+    ),
+))
+
+# IMDS is link-local and answers in milliseconds when healthy: fail fast and
+# retry once rather than stalling the Google call behind a 2s timeout
+IMDS_TIMEOUT = 0.5
+_SESSION.mount("http://169.254.169.254/", HTTPAdapter(
+    max_retries=Retry(total=1, backoff_factor=0.1),
+))
+
+_PURCHASES_URL = "https://androidpublisher.googleapis.com/androidpublisher/v3/applications/{p}/purchases"
+_SUB_URL_TMPL = _PURCHASES_URL + "/subscriptions/{i}/tokens/{t}"
+_PROD_URL_TMPL = _PURCHASES_URL + "/products/{i}/tokens/{t}"
+_SUB_ACK_URL_TMPL = _SUB_URL_TMPL + ":acknowledge"
+_PROD_ACK_URL_TMPL = _PROD_URL_TMPL + ":acknowledge"
+_SUB_CANCEL_URL_TMPL = _SUB_URL_TMPL + ":cancel"
+
+# HTTP/2 client for androidpublisher.googleapis.com: concurrent verify, cancel
+# and acknowledge calls are multiplexed over one connection. Created lazily so
+# its pool belongs to the running event loop.
+_CLIENT = None
+
+# Same policy the requests session applied to Google calls before they moved
+# to httpx (whose transport only retries failed connects): retry verify GETs
+# twice on quota/server errors with exponential backoff. POSTs are not
+# retried, as acknowledge/cancel are not idempotent from our side.
+GOOGLE_RETRIES = 2
+GOOGLE_RETRY_BACKOFF = 0.2
+GOOGLE_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Cap on in-flight Google Play requests so bursts queue here instead of
+# tripping the per-minute quota and stalling behind 429 backoffs. A verify
+# probes the subscription and product endpoints at once and so takes two
+# slots: 20 allows 10 concurrent verifies, or 20 acknowledge/cancel calls.
+GOOGLE_MAX_CONCURRENCY = 20
+
+# Created lazily and dropped with the client, as asyncio primitives bind to
+# the event loop they are first used in (the CLI runs one loop per call)
+_GOOGLE_SEM = None
+
+# Successful verifications are reused for this long; repeat verifies of the
+# same token (restore purchases, client retries) then skip Google entirely
+VERIFY_CACHE_TTL = 60
+
+_VERIFY_CACHE = TTLCache(maxsize=10_000, ttl=VERIFY_CACHE_TTL)
+_VERIFY_CACHE_LOCK = threading.Lock()
+
+# Daemon cancel calls run in the background; their outcome can be polled at
+# GET /status/{jobId} for this long
+JOB_RESULT_TTL = 600
+
+# On shutdown, wait this long for background jobs before closing the client
+# (PM2's kill_timeout for the verifier must be longer)
+JOB_DRAIN_TIMEOUT = 10
+
+_JOBS = TTLCache(maxsize=10_000, ttl=JOB_RESULT_TTL)
+
+# Refresh the cached access token when it has less than this many seconds left
+CREDENTIALS_REFRESH_MARGIN = 300
+
+_CREDS_LOCK = threading.Lock()
+_CREDS = None
+# Google Play request headers, rebuilt only when the access token is refreshed
+_HEADERS = None
+
+IMDS_TOKEN_TTL = 21600
+# Fetch a new IMDSv2 token this many seconds before the cached one expires
+IMDS_TOKEN_REFRESH_MARGIN = 60
+
+_IMDS_TOKEN = None
+_IMDS_TOKEN_EXPIRY = 0.0
+
+def _get_imds_token():
+    """Get an IMDSv2 session token, reusing the cached one until near its TTL"""
+    global _IMDS_TOKEN, _IMDS_TOKEN_EXPIRY
+    if _IMDS_TOKEN and time.monotonic() < _IMDS_TOKEN_EXPIRY - IMDS_TOKEN_REFRESH_MARGIN:
+        return _IMDS_TOKEN
+
+    requested_at = time.monotonic()
+    token_response = _SESSION.put(
+        'http://169.254.169.254/latest/api/token',
+        headers={'X-aws-ec2-metadata-token-ttl-seconds': str(IMDS_TOKEN_TTL)},
+        timeout=IMDS_TIMEOUT
+    )
+    token_response.raise_for_status()
+    _IMDS_TOKEN = token_response.text
+    _IMDS_TOKEN_EXPIRY = requested_at + IMDS_TOKEN_TTL
+    return _IMDS_TOKEN
+
+
+_REGION = None
+
+def _get_region():
+    """Get the AWS region, from the environment or IMDS, once per process"""
+    global _REGION
+    if _REGION:
+        return _REGION
+
+    # Already set under ECS/EKS or by the deploy environment; skip IMDS
+    region = os.environ.get("AWS_REGION") or os.environ.get("AWS_DEFAULT_REGION")
+    if not region:
+        region_response = _SESSION.get(
+            'http://169.254.169.254/latest/meta-data/placement/region',
+            headers={'X-aws-ec2-metadata-token': _get_imds_token()},
+            timeout=IMDS_TIMEOUT
+        )
+        region_response.raise_for_status()
+        region = region_response.text.strip()
+
+    os.environ['AWS_REGION'] = region
+    os.environ['AWS_DEFAULT_REGION'] = region
+    _REGION = region
+    return _REGION
+
+
+def _build_credentials():
+    """Build (unrefreshed) Google credentials using WIF"""
     WORKLOAD_POOL_PROVIDER = os.environ.get("GOOGLE_WIF_PROVIDER",
         "projects/483343108270/locations/global/workloadIdentityPools/deenai-aws-pool/providers/deenai-aws-provider")
     SERVICE_ACCOUNT_EMAIL = os.environ.get("GOOGLE_SERVICE_ACCOUNT_EMAIL",
         "app-distribution@deen-ai-481006.iam.gserviceaccount.com")
     SCOPES = ["https://www.googleapis.com/auth/androidpublisher"]
 
-    # Get AWS region
-    token_response = requests.put(
-        'http://169.254.169.254/latest/api/token',
-        headers={'X-aws-ec2-metadata-token-ttl-seconds': '21600'},
-        timeout=2
-    )
-    token = token_response.text
-    region = requests.get(
-        'http://169.254.169.254/latest/meta-data/placement/region',
-        headers={'X-aws-ec2-metadata-token': token},
-        timeout=2
-    ).text.strip()
-
-    # Set AWS region
-    os.environ['AWS_REGION'] = region
-    os.environ['AWS_DEFAULT_REGION'] = region
+    # Resolve the AWS region (exported as AWS_REGION for google-auth) on a
+    # worker thread, overlapping the IMDS round-trips with the slow import of
+    # google.auth.aws below
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
+        region = pool.submit(_get_region)
+        from google.auth import aws
+        region.result()
 
     # Build WIF credential configuration
     audience = f"//iam.googleapis.com/{WORKLOAD_POOL_PROVIDER}"
@@ -54,69 +187,150 @@ def _get_credentials():
 
     # Create credentials
     credentials = aws.Credentials.from_info(credential_config)
-    credentials = credentials.with_scopes(SCOPES)
+    return credentials.with_scopes(SCOPES)
 
-    # Refresh credentials
-    request = Request()
-    credentials.refresh(request)
-    return credentials
 
+def _get_credentials():
+    """Get authenticated Google credentials, refreshing only when near expiry"""
+    global _CREDS, _HEADERS
+    with _CREDS_LOCK:
+        # google-auth keeps expiry as a naive UTC datetime
+        now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        if (_CREDS is not None and _CREDS.expiry is not None
+                and (_CREDS.expiry - now).total_seconds() >= CREDENTIALS_REFRESH_MARGIN):
+            return _CREDS
 
-def verify_purchase(package_name, product_id, purchase_token):
-    """Verify a Google Play purchase using WIF"""
-    try:
-        credentials = _get_credentials()
-
-        # Try subscription first
-        url = f"https://androidpublisher.googleapis.com/androidpublisher/v3/applications/{package_name}/purchases/subscriptions/{product_id}/tokens/{purchase_token}"
-        response = requests.get(
-            url,
-            headers={
-                "Authorization": f"Bearer {credentials.token}",
-                "Content-Type": "application/json"
-            },
-            timeout=10
+        # Imported here so calls served from a warm token never pay for it
+        from google.auth.transport.requests import Request
+
+        if _CREDS is None:
+            _CREDS = _build_credentials()
+        _CREDS.refresh(Request(session=_SESSION))
+        # Swap in a new dict rather than mutating one that requests may be using
+        _HEADERS = {
+            "Authorization": f"Bearer {_CREDS.token}",
+            "Content-Type": "application/json"
+        }
+        return _CREDS
+
+
+def _get_headers():
+    """Get Google Play request headers carrying a valid access token"""
+    _get_credentials()
+    return _HEADERS
+
+
+def _get_client():
+    """Get the shared HTTP/2 client for Google Play calls"""
+    global _CLIENT
+    if _CLIENT is None or _CLIENT.is_closed:
+        _CLIENT = httpx.AsyncClient(
+            http2=True,
+            timeout=10,
+            limits=httpx.Limits(max_keepalive_connections=16),
         )
+    return _CLIENT
 
-        if response.status_code == 200:
-            data = response.json()
-            return {
-                "success": True,
-                "isSubscription": True,
-                "data": data
-            }
-        elif response.status_code == 404:
-            # Try one-time product instead
-            url = f"https://androidpublisher.googleapis.com/androidpublisher/v3/applications/{package_name}/purchases/products/{product_id}/tokens/{purchase_token}"
-            response = requests.get(
-                url,
-                headers={
-                    "Authorization": f"Bearer {credentials.token}",
-                    "Content-Type": "application/json"
-                },
-                timeout=10
-            )
+
+def _get_google_sem():
+    """Return the concurrency cap for Google calls in the running event loop"""
+    global _GOOGLE_SEM
+    if _GOOGLE_SEM is None:
+        _GOOGLE_SEM = asyncio.Semaphore(GOOGLE_MAX_CONCURRENCY)
+    return _GOOGLE_SEM
+
+
+async def _close_client():
+    """Close the shared HTTP client, if one was opened"""
+    global _CLIENT, _GOOGLE_SEM
+    _GOOGLE_SEM = None
+    if _CLIENT is not None:
+        await _CLIENT.aclose()
+        _CLIENT = None
+
+
+def _invalidate_verification(package_name, product_id, purchase_token):
+    """Drop a cached verification after the purchase state changed"""
+    with _VERIFY_CACHE_LOCK:
+        _VERIFY_CACHE.pop((package_name, product_id, purchase_token), None)
+
+
+async def verify_purchase(package_name, product_id, purchase_token):
+    """Verify a Google Play purchase, serving repeats from a short-lived cache"""
+    key = (package_name, product_id, purchase_token)
+    with _VERIFY_CACHE_LOCK:
+        cached = _VERIFY_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    result = await _fetch_purchase(package_name, product_id, purchase_token)
+    if result["success"]:
+        with _VERIFY_CACHE_LOCK:
+            _VERIFY_CACHE[key] = result
+    return result
+
+
+async def _get_with_retry(client, url, headers):
+    """GET from Android Publisher, retrying quota/server errors"""
+    for attempt in range(GOOGLE_RETRIES + 1):
+        async with _get_google_sem():
+            response = await client.get(url, headers=headers)
+        if response.status_code not in GOOGLE_RETRY_STATUSES or attempt == GOOGLE_RETRIES:
+            return response
+        # Back off outside the semaphore so waiting retries don't hold slots
+        await asyncio.sleep(GOOGLE_RETRY_BACKOFF * 2 ** attempt)
+
+
+async def _fetch_purchase(package_name, product_id, purchase_token):
+    """Verify a Google Play purchase using WIF
+
+    The subscription and one-time product endpoints are queried concurrently;
+    the first 200 wins and the other request is cancelled.
+    """
+    try:
+        headers = await asyncio.to_thread(_get_headers)
+        client = _get_client()
+
+        async def probe(is_subscription):
+            template = _SUB_URL_TMPL if is_subscription else _PROD_URL_TMPL
+            url = template.format(p=package_name, i=product_id, t=purchase_token)
+            response = await _get_with_retry(client, url, headers)
             if response.status_code == 200:
-                data = response.json()
-                return {
-                    "success": True,
-                    "isSubscription": False,
-                    "data": data
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": f"Product verification failed with status {response.status_code}",
-                    "statusCode": response.status_code,
-                    "details": response.text
-                }
-        else:
+                return is_subscription, response.status_code, orjson.loads(response.content)
+            return is_subscription, response.status_code, response.text
+
+        tasks = [asyncio.ensure_future(probe(True)), asyncio.ensure_future(probe(False))]
+        failures = {}
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                is_subscription, status, body = await next_done
+                if status == 200:
+                    return {
+                        "success": True,
+                        "isSubscription": is_subscription,
+                        "data": body
+                    }
+                failures[is_subscription] = (status, body)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        # Report the subscription error unless it was a 404 (i.e. not a subscription)
+        sub_status, sub_details = failures[True]
+        if sub_status != 404:
             return {
                 "success": False,
-                "error": f"Subscription verification failed with status {response.status_code}",
-                "statusCode": response.status_code,
-                "details": response.text
+                "error": f"Subscription verification failed with status {sub_status}",
+                "statusCode": sub_status,
+                "details": sub_details
             }
+        prod_status, prod_details = failures[False]
+        return {
+            "success": False,
+            "error": f"Product verification failed with status {prod_status}",
+            "statusCode": prod_status,
+            "details": prod_details
+        }
 
     except Exception as e:
         return {
@@ -125,23 +339,15 @@ def verify_purchase(package_name, product_id, purchase_token):
             "errorType": type(e).__name__
         }
 
-def acknowledge_subscription(package_name, product_id, purchase_token):
+async def acknowledge_subscription(package_name, product_id, purchase_token):
     """Acknowledge a Google Play subscription purchase using WIF"""
     try:
-        credentials = _get_credentials()
+        headers = await asyncio.to_thread(_get_headers)
 
-        url = (
-            f"https://androidpublisher.googleapis.com/androidpublisher/v3/applications/"
-            f"{package_name}/purchases/subscriptions/{product_id}/tokens/{purchase_token}:acknowledge"
-        )
-        response = requests.post(
-            url,
-            headers={
-                "Authorization": f"Bearer {credentials.token}",
-                "Content-Type": "application/json"
-            },
-            timeout=10
-        )
+        url = _SUB_ACK_URL_TMPL.format(p=package_name, i=product_id, t=purchase_token)
+        async with _get_google_sem():
+            response = await _get_client().post(url, headers=headers)
+        _invalidate_verification(package_name, product_id, purchase_token)
 
         # 204 No Content = success, 200 also acceptable
         if response.status_code in (200, 204):
@@ -162,23 +368,15 @@ def acknowledge_subscription(package_name, product_id, purchase_token):
         }
 
 
-def acknowledge_product(package_name, product_id, purchase_token):
+async def acknowledge_product(package_name, product_id, purchase_token):
     """Acknowledge a Google Play one-time product purchase using WIF"""
     try:
-        credentials = _get_credentials()
+        headers = await asyncio.to_thread(_get_headers)
 
-        url = (
-            f"https://androidpublisher.googleapis.com/androidpublisher/v3/applications/"
-            f"{package_name}/purchases/products/{product_id}/tokens/{purchase_token}:acknowledge"
-        )
-        response = requests.post(
-            url,
-            headers={
-                "Authorization": f"Bearer {credentials.token}",
-                "Content-Type": "application/json"
-            },
-            timeout=10
-        )
+        url = _PROD_ACK_URL_TMPL.format(p=package_name, i=product_id, t=purchase_token)
+        async with _get_google_sem():
+            response = await _get_client().post(url, headers=headers)
+        _invalidate_verification(package_name, product_id, purchase_token)
 
         if response.status_code in (200, 204):
             return {"success": True}
@@ -198,23 +396,15 @@ def acknowledge_product(package_name, product_id, purchase_token):
         }
 
 
-def cancel_subscription(package_name, product_id, purchase_token):
+async def cancel_subscription(package_name, product_id, purchase_token):
     """Cancel a Google Play subscription using WIF"""
     try:
-        credentials = _get_credentials()
+        headers = await asyncio.to_thread(_get_headers)
 
-        url = (
-            f"https://androidpublisher.googleapis.com/androidpublisher/v3/applications/"
-            f"{package_name}/purchases/subscriptions/{product_id}/tokens/{purchase_token}:cancel"
-        )
-        response = requests.post(
-            url,
-            headers={
-                "Authorization": f"Bearer {credentials.token}",
-                "Content-Type": "application/json"
-            },
-            timeout=10
-        )
+        url = _SUB_CANCEL_URL_TMPL.format(p=package_name, i=product_id, t=purchase_token)
+        async with _get_google_sem():
+            response = await _get_client().post(url, headers=headers)
+        _invalidate_verification(package_name, product_id, purchase_token)
 
         # 204 No Content = success, 200 also acceptable
         if response.status_code in (200, 204):
@@ -235,60 +425,382 @@ def cancel_subscription(package_name, product_id, purchase_token):
         }
 
 
+async def verify_and_acknowledge(package_name, product_id, purchase_token):
+    """Verify a purchase and acknowledge it if needed, in one call
+
+    Async generator yielding ``{"verification": ..., "acknowledging": bool}``
+    as soon as the purchase is verified, then ``{"acknowledgement": ...}`` if
+    an acknowledge was sent (``acknowledging`` is true).
+    The acknowledge POST is started before the verification is yielded, so it
+    overlaps with the caller handling the first result.
+    """
+    verification = await verify_purchase(package_name, product_id, purchase_token)
+    data = verification.get("data") or {}
+    if not verification["success"] or data.get("acknowledgementState") == 1:
+        yield {"verification": verification, "acknowledging": False}
+        return
+
+    acknowledge = acknowledge_subscription if verification["isSubscription"] else acknowledge_product
+    ack_task = asyncio.ensure_future(acknowledge(package_name, product_id, purchase_token))
+    _invalidate_verification(package_name, product_id, purchase_token)
+    yield {"verification": verification, "acknowledging": True}
+    yield {"acknowledgement": await ack_task}
+
+
+# ---------------------------------------------------------------------------
+# Daemon
+# ---------------------------------------------------------------------------
+
+def _purchase_args(payload):
+    """Extract (package_name, product_id, purchase_token), or raise ValueError"""
+    args = (payload.get("packageName"), payload.get("productId"), payload.get("purchaseToken"))
+    if not all(isinstance(arg, str) and arg for arg in args):
+        raise ValueError("packageName, productId and purchaseToken are required")
+    return args
+
+
+def _dispatch(action, payload):
+    """Resolve a daemon/CLI action to (function, args), or raise ValueError"""
+    args = _purchase_args(payload)
+
+    if action == "verify":
+        return verify_purchase, args
+    if action == "cancel":
+        return cancel_subscription, args
+    if action == "acknowledge":
+        ack_type = payload.get("type")
+        if ack_type == "subscription":
+            return acknowledge_subscription, args
+        if ack_type == "product":
+            return acknowledge_product, args
+        raise ValueError(f"Unknown acknowledge type: {ack_type}. Use 'subscription' or 'product'.")
+    raise ValueError(f"Unknown action: {action}")
+
+
+def serve(socket_path=SOCKET_PATH):
+    """Serve verify/cancel/acknowledge over HTTP on a Unix domain socket
+
+    Cancel returns a job ticket straight away and runs in the background
+    unless the request body sets ``"wait": true``; the outcome is available at
+    ``GET /status/{jobId}``. Acknowledge waits for Google by default, since a
+    lost acknowledgement means an auto-refund, and only queues when the body
+    sets ``"wait": false``. Queued jobs are drained before the daemon exits.
+    """
+    from aiohttp import web
+
+    def json_response(obj, status=200):
+        # All daemon bodies go through orjson, not aiohttp's stdlib json
+        return web.Response(body=orjson.dumps(obj), status=status, content_type="application/json")
+
+    async def read_json(request):
+        return orjson.loads(await request.read())
+
+    # Strong references so pending jobs are not garbage collected
+    background = set()
+
+    async def run_job(job_id, action, fn, args):
+        result = await fn(*args)
+        _JOBS[job_id] = {"status": "done", "result": result}
+        if not result["success"]:
+            print(f"Background {action} job {job_id} failed: {result.get('error')}", file=sys.stderr, flush=True)
+
+    async def handle(request):
+        action = request.match_info["action"]
+        try:
+            payload = await read_json(request)
+            fn, args = _dispatch(action, payload)
+        except (ValueError, AttributeError) as e:
+            return json_response({"success": False, "error": str(e)}, status=400)
+
+        # Cancel is queued unless the caller waits; acknowledge only on request
+        if action in ("acknowledge", "cancel") and not payload.get("wait", action == "acknowledge"):
+            # Drop the cached verification now, not when the job finishes, so
+            # a verify in between cannot see the old state and re-acknowledge
+            _invalidate_verification(*args)
+            job_id = str(uuid.uuid4())
+            _JOBS[job_id] = {"status": "pending"}
+            task = asyncio.ensure_future(run_job(job_id, action, fn, args))
+            background.add(task)
+            task.add_done_callback(background.discard)
+            return json_response({"success": True, "async": True, "jobId": job_id})
+
+        result = await fn(*args)
+        return json_response(result)
+
+    async def status(request):
+        job_id = request.match_info["job_id"]
+        job = _JOBS.get(job_id)
+        if job is None:
+            return json_response({"success": False, "error": "Unknown or expired job"}, status=404)
+        return json_response({"success": True, "jobId": job_id, **job})
+
+    async def handle_verify_and_acknowledge(request):
+        try:
+            args = _purchase_args(await read_json(request))
+        except (ValueError, AttributeError) as e:
+            return json_response({"success": False, "error": str(e)}, status=400)
+
+        # Newline-delimited JSON, flushed line by line
+        response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+        await response.prepare(request)
+        async for line in verify_and_acknowledge(*args):
+            await response.write(orjson.dumps(line) + b"\n")
+        await response.write_eof()
+        return response
+
+    async def health(request):
+        return json_response({"success": True})
+
+    async def on_shutdown(app):
+        # Runs before on_cleanup closes the client, so queued jobs can finish
+        if not background:
+            return
+        _, pending = await asyncio.wait(set(background), timeout=JOB_DRAIN_TIMEOUT)
+        for task in pending:
+            task.cancel()
+        if pending:
+            print(f"Dropped {len(pending)} background job(s) still running at shutdown", file=sys.stderr, flush=True)
+
+    async def on_cleanup(app):
+        await _close_client()
+
+    app = web.Application()
+    app.on_shutdown.append(on_shutdown)
+    app.on_cleanup.append(on_cleanup)
+    app.router.add_post("/{action:verify|cancel|acknowledge}", handle)
+    app.router.add_post("/verify-and-acknowledge", handle_verify_and_acknowledge)
+    app.router.add_get("/status/{job_id}", status)
+    app.router.add_get("/health", health)
+
+    async def run():
+        # Remove a stale socket left behind by a previous run
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+        # PM2 stops the daemon with SIGINT (SIGTERM from other supervisors);
+        # exit through runner.cleanup() so background jobs are drained
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.UnixSite(runner, socket_path).start()
+        os.chmod(socket_path, 0o600)
+        try:
+            await stop.wait()
+        finally:
+            await runner.cleanup()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection over a Unix domain socket"""
+
+    def __init__(self, socket_path, timeout):
+        super().__init__("localhost", timeout=timeout)
+        self._socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self._socket_path)
+
+
+def _open_daemon(action, payload, socket_path=SOCKET_PATH):
+    """POST an action to a running daemon and return the response
+
+    Returns None only when the daemon is not running (no socket, or the
+    connection was refused), i.e. when nothing was sent and the caller may
+    run the action itself. Failures after connecting raise OSError: the
+    action may already be in flight and must not be repeated.
+    """
+    conn = _UnixHTTPConnection(socket_path, timeout=15)
+    try:
+        conn.connect()
+    except (FileNotFoundError, ConnectionRefusedError):
+        conn.close()
+        return None
+
+    try:
+        conn.request(
+            "POST",
+            f"/{action}",
+            body=orjson.dumps(payload),
+            headers={"Content-Type": "application/json"},
+        )
+        return conn.getresponse()
+    except OSError:
+        conn.close()
+        raise
+
+
+def _daemon_error(e):
+    """Result for a daemon call that failed after the request was sent"""
+    return {
+        "success": False,
+        "error": f"Verifier daemon request failed: {e}",
+        "errorType": type(e).__name__
+    }
+
+
+def _call_daemon(action, payload):
+    """Forward an action to a running daemon; returns None if it is not running"""
+    try:
+        response = _open_daemon(action, payload)
+    except OSError as e:
+        return _daemon_error(e)
+    if response is None:
+        return None
+    try:
+        return orjson.loads(response.read())
+    except (OSError, orjson.JSONDecodeError) as e:
+        return _daemon_error(e)
+    finally:
+        response.close()
+
+
+def _run(action, payload):
+    """Run an action via the daemon if it is running, otherwise in-process"""
+    # The CLI reports the final outcome, so never take a background job ticket
+    result = _call_daemon(action, {**payload, "wait": True})
+    if result is not None:
+        return result
+    try:
+        fn, args = _dispatch(action, payload)
+    except ValueError as e:
+        return {"success": False, "error": str(e)}
+    return asyncio.run(_run_once(fn, args))
+
+
+def _run_verify_and_acknowledge(payload):
+    """Collect verify-and-acknowledge lines via the daemon, otherwise in-process"""
+    try:
+        response = _open_daemon("verify-and-acknowledge", payload)
+    except OSError as e:
+        return [{"verification": _daemon_error(e)}]
+
+    if response is not None:
+        lines = []
+        try:
+            for line in response:
+                if line.strip():
+                    lines.append(orjson.loads(line))
+        except (OSError, orjson.JSONDecodeError) as e:
+            # Report the failure against whichever step we were waiting for
+            step = "acknowledgement" if lines else "verification"
+            lines.append({step: _daemon_error(e)})
+        finally:
+            response.close()
+        return lines
+
+    async def collect(args):
+        try:
+            return [line async for line in verify_and_acknowledge(*args)]
+        finally:
+            await _close_client()
+
+    try:
+        args = _purchase_args(payload)
+    except ValueError as e:
+        return [{"verification": {"success": False, "error": str(e)}}]
+    return asyncio.run(collect(args))
+
+
+def _write_json(obj):
+    """Write one JSON line to stdout for the Node.js caller"""
+    sys.stdout.buffer.write(orjson.dumps(obj) + b"\n")
+    sys.stdout.buffer.flush()
+
+
+async def _run_once(fn, args):
+    """Run a coroutine action and close the HTTP session before the loop ends"""
+    try:
+        return await fn(*args)
+    finally:
+        await _close_client()
+
+
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print(json.dumps({
+        _write_json({
             "success": False,
-            "error": "Usage: verify_google_purchase.py <verify|cancel> <package_name> <product_id> <purchase_token>"
-        }))
+            "error": "Usage: verify_google_purchase.py <serve|verify|cancel|acknowledge|verify-and-acknowledge> [args...]"
+        })
         sys.exit(1)
 
     action = sys.argv[1]
 
-    if action == "verify":
+    if action == "serve":
+        serve(sys.argv[2] if len(sys.argv) > 2 else SOCKET_PATH)
+        sys.exit(0)
+    elif action == "verify":
         if len(sys.argv) != 5:
-            print(json.dumps({
+            _write_json({
                 "success": False,
                 "error": "Usage: verify_google_purchase.py verify <package_name> <product_id> <purchase_token>"
-            }))
+            })
             sys.exit(1)
-        result = verify_purchase(sys.argv[2], sys.argv[3], sys.argv[4])
+        result = _run("verify", {
+            "packageName": sys.argv[2], "productId": sys.argv[3], "purchaseToken": sys.argv[4]
+        })
     elif action == "cancel":
         if len(sys.argv) != 5:
-            print(json.dumps({
+            _write_json({
                 "success": False,
                 "error": "Usage: verify_google_purchase.py cancel <package_name> <product_id> <purchase_token>"
-            }))
+            })
             sys.exit(1)
-        result = cancel_subscription(sys.argv[2], sys.argv[3], sys.argv[4])
+        result = _run("cancel", {
+            "packageName": sys.argv[2], "productId": sys.argv[3], "purchaseToken": sys.argv[4]
+        })
     elif action == "acknowledge":
         if len(sys.argv) != 6:
-            print(json.dumps({
+            _write_json({
                 "success": False,
                 "error": "Usage: verify_google_purchase.py acknowledge <type> <package_name> <product_id> <purchase_token>"
-            }))
+            })
             sys.exit(1)
         ack_type = sys.argv[2]  # "subscription" or "product"
-        if ack_type == "subscription":
-            result = acknowledge_subscription(sys.argv[3], sys.argv[4], sys.argv[5])
-        elif ack_type == "product":
-            result = acknowledge_product(sys.argv[3], sys.argv[4], sys.argv[5])
-        else:
-            print(json.dumps({
+        if ack_type not in ("subscription", "product"):
+            _write_json({
                 "success": False,
                 "error": f"Unknown acknowledge type: {ack_type}. Use 'subscription' or 'product'."
-            }))
+            })
+            sys.exit(1)
+        result = _run("acknowledge", {
+            "type": ack_type, "packageName": sys.argv[3], "productId": sys.argv[4], "purchaseToken": sys.argv[5]
+        })
+    elif action == "verify-and-acknowledge":
+        if len(sys.argv) != 5:
+            _write_json({
+                "success": False,
+                "error": "Usage: verify_google_purchase.py verify-and-acknowledge <package_name> <product_id> <purchase_token>"
+            })
             sys.exit(1)
+        lines = _run_verify_and_acknowledge({
+            "packageName": sys.argv[2], "productId": sys.argv[3], "purchaseToken": sys.argv[4]
+        })
+        for line in lines:
+            _write_json(line)
+        sys.exit(0 if lines[0]["verification"]["success"] else 1)
     else:
         # Backward compatibility: treat 3 positional args as verify
         if len(sys.argv) == 4:
-            result = verify_purchase(sys.argv[1], sys.argv[2], sys.argv[3])
+            result = _run("verify", {
+                "packageName": sys.argv[1], "productId": sys.argv[2], "purchaseToken": sys.argv[3]
+            })
         else:
-            print(json.dumps({
+            _write_json({
                 "success": False,
-                "error": f"Unknown action: {action}. Use 'verify' or 'cancel'."
-            }))
+                "error": f"Unknown action: {action}. Use 'serve', 'verify', 'cancel', 'acknowledge' or 'verify-and-acknowledge'."
+            })
             sys.exit(1)
 
-    print(json.dumps(result))
+    _write_json(result)
     sys.exit(0 if result["success"] else 1)
@@ -1,10 +1,13 @@
 import { Test, TestingModule } from '@nestjs/testing';
 import { ConfigService } from '@nestjs/config';
 import { HttpException } from '@nestjs/common';
+import { Readable } from 'stream';
 import { GoogleVerificationService } from './google-verification.service';
 
 // Create a mock function that will be set up in beforeEach
 let mockExecAsync: jest.Mock;
+let mockRequestDaemon: jest.SpyInstance;
+let mockOpenDaemon: jest.SpyInstance;
 
 // Mock the entire module
 jest.mock('util', () => {
@@ -42,6 +45,18 @@ describe('GoogleVerificationService', () => {
     }).compile();
 
     service = module.get<GoogleVerificationService>(GoogleVerificationService);
+
+    // Default to "daemon not running" so calls fall back to the subprocess
+    const daemonUnavailable = Object.assign(
+      new Error('connect ENOENT /tmp/gplay.sock'),
+      { code: 'ENOENT' },
+    );
+    mockRequestDaemon = jest
+      .spyOn(service as any, 'requestDaemon')
+      .mockRejectedValue(daemonUnavailable);
+    mockOpenDaemon = jest
+      .spyOn(service as any, 'openDaemon')
+      .mockRejectedValue(daemonUnavailable);
   });
 
   describe('verify', () => {
@@ -260,4 +275,215 @@ describe('GoogleVerificationService', () => {
       expect(result.success).toBe(true);
     });
   });
+
+  describe('verifier daemon', () => {
+    const params = {
+      packageName: 'com.storytime.app',
+      productId: 'com.storytime.monthly',
+      purchaseToken: 'valid-token-123',
+    };
+
+    it('should use the daemon response without spawning the script', async () => {
+      mockRequestDaemon.mockResolvedValue(JSON.stringify({ success: true }));
+
+      const result = await service.acknowledgePurchase(params, true);
+
+      expect(result.success).toBe(true);
+      expect(mockRequestDaemon).toHaveBeenCalledWith('acknowledge', {
+        type: 'subscription',
+        ...params,
+      });
+      expect(mockExecAsync).not.toHaveBeenCalled();
+    });
+
+    it('should return the job ticket for queued daemon calls', async () => {
+      mockRequestDaemon.mockResolvedValue(
+        JSON.stringify({ success: true, async: true, jobId: 'job-123' }),
+      );
+
+      const result = await service.cancelSubscription(params);
+
+      expect(result).toEqual({ success: true, async: true, jobId: 'job-123' });
+      expect(mockExecAsync).not.toHaveBeenCalled();
+    });
+
+    it('should fall back to the script when the daemon is unavailable', async () => {
+      mockExecAsync.mockResolvedValue({
+        stdout: JSON.stringify({ success: true }),
+        stderr: '',
+      });
+
+      const result = await service.cancelSubscription(params);
+
+      expect(result.success).toBe(true);
+      expect(mockExecAsync).toHaveBeenCalledWith(
+        expect.any(String),
+        expect.arrayContaining(['cancel', 'com.storytime.app']),
+        expect.any(Object),
+      );
+    });
+
+    it('should not spawn the script when the daemon request times out', async () => {
+      mockRequestDaemon.mockRejectedValue(
+        new Error('Verifier daemon request timed out'),
+      );
+
+      const result = await service.cancelSubscription(params);
+
+      expect(result.success).toBe(false);
+      expect(mockExecAsync).not.toHaveBeenCalled();
+    });
+  });
+
+  describe('waitForJob', () => {
+    let mockRequestJobStatus: jest.SpyInstance;
+
+    beforeEach(() => {
+      jest.useFakeTimers();
+      mockRequestJobStatus = jest.spyOn(service as any, 'requestJobStatus');
+    });
+
+    afterEach(() => {
+      jest.useRealTimers();
+    });
+
+    it('should poll until the queued job is done', async () => {
+      mockRequestJobStatus
+        .mockResolvedValueOnce(
+          JSON.stringify({ success: true, jobId: 'job-1', status: 'pending' }),
+        )
+        .mockResolvedValueOnce(
+          JSON.stringify({
+            success: true,
+            jobId: 'job-1',
+            status: 'done',
+            result: { success: false, error: 'Cancel failed with status 500' },
+          }),
+        );
+
+      const pending = service.waitForJob('job-1');
+      await jest.advanceTimersByTimeAsync(1000);
+
+      await expect(pending).resolves.toEqual({
+        success: false,
+        error: 'Cancel failed with status 500',
+      });
+      expect(mockRequestJobStatus).toHaveBeenCalledTimes(2);
+    });
+
+    it('should report an unknown or expired job as a failure', async () => {
+      mockRequestJobStatus.mockResolvedValue(
+        JSON.stringify({ success: false, error: 'Unknown or expired job' }),
+      );
+
+      await expect(service.waitForJob('job-2')).resolves.toEqual({
+        success: false,
+        error: 'Unknown or expired job',
+      });
+    });
+
+    it('should not reject when the daemon cannot be reached', async () => {
+      mockRequestJobStatus.mockRejectedValue(
+        new Error('connect ECONNREFUSED /tmp/gplay.sock'),
+      );
+
+      const result = await service.waitForJob('job-3');
+
+      expect(result.success).toBe(false);
+    });
+  });
+
+  describe('verifyAndAcknowledge', () => {
+    const params = {
+      purchaseToken: 'valid-token-123',
+      productId: 'com.storytime.coins',
+    };
+    const verification = {
+      success: true,
+      isSubscription: false,
+      data: { orderId: 'GPA.1234', purchaseState: 0, acknowledgementState: 0 },
+    };
+    const ndjson = (...lines: object[]) =>
+      lines.map((line) => JSON.stringify(line) + '\n');
+
+    it('should resolve the verification before the acknowledgement', async () => {
+      mockOpenDaemon.mockResolvedValue(
+        Readable.from(
+          ndjson(
+            { verification, acknowledging: true },
+            { acknowledgement: { success: true } },
+          ),
+        ),
+      );
+
+      const result = await service.verifyAndAcknowledge(params);
+
+      expect(result.verification.success).toBe(true);
+      expect(result.verification.platformTxId).toBe('GPA.1234');
+      expect(mockOpenDaemon).toHaveBeenCalledWith('/verify-and-acknowledge', {
+        packageName: 'com.storytime.app',
+        ...params,
+      });
+      await expect(result.acknowledgement).resolves.toEqual({ success: true });
+      expect(mockExecAsync).not.toHaveBeenCalled();
+    });
+
+    it('should not return an acknowledgement when none is needed', async () => {
+      mockOpenDaemon.mockResolvedValue(
+        Readable.from(ndjson({ verification, acknowledging: false })),
+      );
+
+      const result = await service.verifyAndAcknowledge(params);
+
+      expect(result.verification.success).toBe(true);
+      expect(result.acknowledgement).toBeUndefined();
+    });
+
+    it('should report a failed acknowledgement without rejecting', async () => {
+      mockOpenDaemon.mockResolvedValue(
+        Readable.from(ndjson({ verification, acknowledging: true })),
+      );
+
+      const result = await service.verifyAndAcknowledge(params);
+
+      await expect(result.acknowledgement).resolves.toMatchObject({
+        success: false,
+      });
+    });
+
+    it('should fall back to the script when the daemon is unavailable', async () => {
+      mockExecAsync.mockResolvedValue({
+        stdout: ndjson(
+          { verification, acknowledging: true },
+          { acknowledgement: { success: true } },
+        ).join(''),
+        stderr: '',
+      });
+
+      const result = await service.verifyAndAcknowledge(params);
+
+      expect(result.verification.success).toBe(true);
+      await expect(result.acknowledgement).resolves.toEqual({ success: true });
+      expect(mockExecAsync).toHaveBeenCalledWith(
+        expect.any(String),
+        expect.arrayContaining(['verify-and-acknowledge', 'com.storytime.app']),
+        expect.any(Object),
+      );
+    });
+
+    it('should throw HttpException when the verifier returns an error', async () => {
+      mockOpenDaemon.mockResolvedValue(
+        Readable.from(
+          ndjson({
+            verification: { success: false, error: 'Purchase not found' },
+            acknowledging: false,
+          }),
+        ),
+      );
+
+      await expect(service.verifyAndAcknowledge(params)).rejects.toThrow(
+        HttpException,
+      );
+    });
+  });
 });
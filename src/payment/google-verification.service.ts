@@ -2,6 +2,7 @@ import { HttpException, HttpStatus, Injectable, Logger } from '@nestjs/common';
 import { ConfigService } from '@nestjs/config';
 import { promisify } from 'util';
 import { execFile, type ExecFileOptions } from 'child_process';
+import * as http from 'http';
 import * as path from 'path';
 
 /** Result from Google verification */
@@ -23,6 +24,9 @@ export interface GoogleVerificationResult {
 export interface GoogleCancelResult {
   success: boolean;
   error?: string;
+  /** Set when the daemon queued the call instead of waiting for Google */
+  async?: boolean;
+  jobId?: string;
 }
 
 /** Result from Google purchase acknowledgement */
@@ -31,6 +35,13 @@ export interface GoogleAcknowledgeResult {
   error?: string;
 }
 
+/** Result from a combined verify + acknowledge call */
+export interface GoogleVerifyAndAcknowledgeResult {
+  verification: GoogleVerificationResult;
+  /** Present when the purchase was not yet acknowledged and one was sent */
+  acknowledgement?: Promise<GoogleAcknowledgeResult>;
+}
+
 /** Parameters for Google Play purchase operations (verify, cancel, acknowledge) */
 export interface GooglePurchaseParams {
   packageName: string;
@@ -85,24 +96,67 @@ type GooglePythonResponse =
   | GooglePythonSuccessResponse
   | GooglePythonErrorResponse;
 
+/** Response from the verifier daemon's GET /status/{jobId} */
+interface GoogleJobStatusResponse {
+  success: boolean;
+  error?: string;
+  status?: 'pending' | 'done';
+  result?: GoogleCancelResult;
+}
+
+/** One NDJSON line from the verifier's verify-and-acknowledge action */
+interface GoogleVerifierStreamLine {
+  verification?: GooglePythonResponse;
+  /** Set on the verification line when an acknowledgement line follows */
+  acknowledging?: boolean;
+  acknowledgement?: GoogleAcknowledgeResult;
+}
+
 const execFileAsync = promisify(execFile) as (
   file: string,
   args: string[],
   options?: ExecFileOptions,
 ) => Promise<{ stdout: string; stderr: string }>;
 
+/** Default Unix socket of the long-lived Python verifier daemon */
+const DEFAULT_VERIFIER_SOCKET = '/tmp/gplay.sock';
+
+/** Timeout for a single verifier call (daemon or subprocess) */
+const VERIFIER_TIMEOUT_MS = 10000;
+
+/** How often and how long to poll the daemon for a queued cancel's outcome */
+const JOB_POLL_INTERVAL_MS = 1000;
+const JOB_POLL_TIMEOUT_MS = 30000;
+
+/** Socket errors meaning the daemon is not running, so spawning is safe */
+const DAEMON_UNAVAILABLE_CODES = new Set(['ENOENT', 'ECONNREFUSED']);
+
+type VerifierAction =
+  | 'verify'
+  | 'cancel'
+  | 'acknowledge'
+  | 'verify-and-acknowledge';
+
 /**
  * Service to verify Google Play purchases using a Python script.
  *
  * NOTE: WIF (Workload Identity Federation) authentication is handled by the Python script.
  * The Node.js google-auth-library has bugs with AWS IMDS (metadata service),
  * so we delegate to Python's google-auth library which works correctly.
+ *
+ * The script normally runs as a daemon (`verify_google_purchase.py serve`) and is
+ * called over HTTP on a Unix socket, so interpreter startup and credential setup
+ * are paid once. If the daemon is not running we fall back to spawning the script.
+ * The daemon queues cancel calls and answers with a job ticket (`async: true`)
+ * whose outcome is read with waitForJob; acknowledge calls wait for Google.
  */
 @Injectable()
 export class GoogleVerificationService {
   private readonly logger = new Logger(GoogleVerificationService.name);
   private readonly pythonPath: string;
   private readonly scriptPath: string;
+  private readonly socketPath: string;
+  private readonly daemonAgent = new http.Agent({ keepAlive: true });
 
   constructor(private readonly configService: ConfigService) {
     // Use process.cwd() for robustness - works regardless of dist/ structure
@@ -114,9 +168,91 @@ export class GoogleVerificationService {
       path.join(scriptsDir, '.venv/bin/python3');
 
     this.scriptPath = path.join(scriptsDir, 'verify_google_purchase.py');
+
+    this.socketPath =
+      this.configService.get<string>('GOOGLE_PLAY_VERIFIER_SOCKET') ||
+      process.env.GOOGLE_PLAY_VERIFIER_SOCKET ||
+      DEFAULT_VERIFIER_SOCKET;
   }
 
   async verify(params: VerifyParams): Promise<GoogleVerificationResult> {
+    const { packageName, productId, purchaseToken } =
+      this.resolveVerifyParams(params);
+
+    this.logger.log(
+      `Starting Google verification for package ${this.sanitizeForLog(packageName)} product ${this.sanitizeForLog(productId)}`,
+    );
+
+    try {
+      // Call Python verifier to verify purchase using WIF
+      this.logger.debug('Executing Python verification');
+      const { stdout, stderr } = await this.runVerifier(
+        'verify',
+        { packageName, productId, purchaseToken },
+        [packageName, productId, purchaseToken],
+      );
+
+      if (stderr) {
+        this.logger.warn(
+          `Python script stderr received (len=${stderr.length})`,
+        );
+      }
+
+      // Parse JSON response from Python script
+      const result = JSON.parse(stdout.trim()) as GooglePythonResponse;
+      return this.toVerificationResult(result, productId, packageName);
+    } catch (error) {
+      throw this.verificationError(error, packageName, productId);
+    }
+  }
+
+  /**
+   * Verify a purchase and, if Google reports it as not yet acknowledged,
+   * acknowledge it (to prevent auto-refund after 3 days) in the same verifier
+   * call. Resolves as soon as the verification is known; the acknowledgement
+   * is returned as a promise that settles once Google answers, and never rejects.
+   */
+  async verifyAndAcknowledge(
+    params: VerifyParams,
+  ): Promise<GoogleVerifyAndAcknowledgeResult> {
+    const { packageName, productId, purchaseToken } =
+      this.resolveVerifyParams(params);
+
+    this.logger.log(
+      `Starting Google verification with acknowledgement for package ${this.sanitizeForLog(packageName)} product ${this.sanitizeForLog(productId)}`,
+    );
+
+    const lines = this.streamVerifier(
+      'verify-and-acknowledge',
+      { packageName, productId, purchaseToken },
+      [packageName, productId, purchaseToken],
+    );
+
+    try {
+      const first = await lines.next();
+      if (first.done || !first.value.verification) {
+        throw new Error('Verifier returned no verification result');
+      }
+
+      const verification = this.toVerificationResult(
+        first.value.verification,
+        productId,
+        packageName,
+      );
+
+      if (!first.value.acknowledging) {
+        await lines.return(undefined);
+        return { verification };
+      }
+      return { verification, acknowledgement: this.readAcknowledgement(lines) };
+    } catch (error) {
+      await lines.return(undefined);
+      throw this.verificationError(error, packageName, productId);
+    }
+  }
+
+  /** Trim and validate verification params, filling in the configured package */
+  private resolveVerifyParams(params: VerifyParams): GooglePurchaseParams {
     const configPackageName = this.configService.get<string>(
       'GOOGLE_PLAY_PACKAGE_NAME',
     );
@@ -138,105 +274,111 @@ export class GoogleVerificationService {
       );
     }
 
-    this.logger.log(
-      `Starting Google verification for package ${this.sanitizeForLog(packageName)} product ${this.sanitizeForLog(productId)}`,
-    );
+    return { packageName, productId, purchaseToken };
+  }
 
-    try {
-      // Call Python script to verify purchase using WIF
-      // Using execFile with array arguments prevents command injection
-      this.logger.debug('Executing Python verification script');
-      const { stdout, stderr } = await execFileAsync(
-        this.pythonPath,
-        [this.scriptPath, 'verify', packageName, productId, purchaseToken],
-        {
-          timeout: 10000, // 10 second timeout (reduced from 30s)
-          encoding: 'utf8',
-        },
+  /** Map the Python verifier response to our result format */
+  private toVerificationResult(
+    result: GooglePythonResponse,
+    productId: string,
+    packageName: string,
+  ): GoogleVerificationResult {
+    if (!result.success) {
+      const statusSuffix = result.statusCode
+        ? ` (status=${result.statusCode})`
+        : '';
+      this.logger.error(`Python verification failed${statusSuffix}`);
+      throw new HttpException(
+        result.error || 'Failed to verify Google Play purchase',
+        result.statusCode || HttpStatus.BAD_REQUEST,
       );
+    }
 
-      if (stderr) {
-        this.logger.warn(
-          `Python script stderr received (len=${stderr.length})`,
-        );
-      }
+    const data = result.data;
 
-      // Parse JSON response from Python script
-      const result = JSON.parse(stdout.trim()) as GooglePythonResponse;
+    if (result.isSubscription) {
+      const subData = data as GoogleSubscriptionPurchase;
+      const active = this.isSubscriptionActive(subData);
+      return {
+        success: active,
+        platformTxId: subData.orderId ?? undefined,
+        productId,
+        amount: subData.priceAmountMicros
+          ? Number(subData.priceAmountMicros) / 1_000_000
+          : null,
+        amountUsd: null,
+        currency: subData.priceCurrencyCode ?? null,
+        purchaseTime: this.toDate(subData.startTimeMillis),
+        expirationTime: this.toDate(subData.expiryTimeMillis),
+        isSubscription: true,
+        raw: data,
+        metadata: {
+          acknowledgementState: subData.acknowledgementState,
+          paymentState: subData.paymentState,
+          cancelReason: subData.cancelReason,
+          packageName,
+        },
+      };
+    }
 
-      if (!result.success) {
-        const statusSuffix = result.statusCode
-          ? ` (status=${result.statusCode})`
-          : '';
-        this.logger.error(`Python verification failed${statusSuffix}`);
-        throw new HttpException(
-          result.error || 'Failed to verify Google Play purchase',
-          result.statusCode || HttpStatus.BAD_REQUEST,
-        );
-      }
+    const productData = data as GoogleProductPurchase;
+    const active = this.isProductActive(productData);
+    return {
+      success: active,
+      platformTxId: productData.orderId ?? undefined,
+      productId,
+      amount: productData.priceAmountMicros
+        ? Number(productData.priceAmountMicros) / 1_000_000
+        : null,
+      amountUsd: null,
+      currency: productData.priceCurrencyCode ?? null,
+      purchaseTime: this.toDate(productData.purchaseTimeMillis),
+      expirationTime: null,
+      isSubscription: false,
+      raw: data,
+      metadata: {
+        consumptionState: productData.consumptionState,
+        developerPayload: productData.developerPayload,
+        packageName,
+      },
+    };
+  }
 
-      const data = result.data;
-      const isSubscription = result.isSubscription;
-
-      // Map Python response to our result format
-      if (isSubscription) {
-        const subData = data as GoogleSubscriptionPurchase;
-        const active = this.isSubscriptionActive(subData);
-        return {
-          success: active,
-          platformTxId: subData.orderId ?? undefined,
-          productId,
-          amount: subData.priceAmountMicros
-            ? Number(subData.priceAmountMicros) / 1_000_000
-            : null,
-          amountUsd: null,
-          currency: subData.priceCurrencyCode ?? null,
-          purchaseTime: this.toDate(subData.startTimeMillis),
-          expirationTime: this.toDate(subData.expiryTimeMillis),
-          isSubscription: true,
-          raw: data,
-          metadata: {
-            acknowledgementState: subData.acknowledgementState,
-            paymentState: subData.paymentState,
-            cancelReason: subData.cancelReason,
-            packageName,
-          },
-        };
-      } else {
-        const productData = data as GoogleProductPurchase;
-        const active = this.isProductActive(productData);
-        return {
-          success: active,
-          platformTxId: productData.orderId ?? undefined,
-          productId,
-          amount: productData.priceAmountMicros
-            ? Number(productData.priceAmountMicros) / 1_000_000
-            : null,
-          amountUsd: null,
-          currency: productData.priceCurrencyCode ?? null,
-          purchaseTime: this.toDate(productData.purchaseTimeMillis),
-          expirationTime: null,
-          isSubscription: false,
-          raw: data,
-          metadata: {
-            consumptionState: productData.consumptionState,
-            developerPayload: productData.developerPayload,
-            packageName,
-          },
-        };
-      }
-    } catch (error) {
-      if (error instanceof HttpException) {
-        throw error;
-      }
+  /** Normalise a verification failure to an HttpException */
+  private verificationError(
+    error: unknown,
+    packageName: string,
+    productId: string,
+  ): HttpException {
+    if (error instanceof HttpException) {
+      return error;
+    }
 
-      this.logger.error(
-        `Google verification failed for package ${this.sanitizeForLog(packageName)} product ${this.sanitizeForLog(productId)}: ${this.errorMessage(error)}`,
-      );
-      throw new HttpException(
-        'Failed to verify Google Play purchase',
-        HttpStatus.BAD_REQUEST,
+    this.logger.error(
+      `Google verification failed for package ${this.sanitizeForLog(packageName)} product ${this.sanitizeForLog(productId)}: ${this.errorMessage(error)}`,
+    );
+    return new HttpException(
+      'Failed to verify Google Play purchase',
+      HttpStatus.BAD_REQUEST,
+    );
+  }
+
+  /** Read the acknowledgement line that follows a verification */
+  private async readAcknowledgement(
+    lines: AsyncGenerator<GoogleVerifierStreamLine>,
+  ): Promise<GoogleAcknowledgeResult> {
+    try {
+      const next = await lines.next();
+      return (
+        (!next.done && next.value.acknowledgement) || {
+          success: false,
+          error: 'Verifier stream ended before the acknowledgement',
+        }
       );
+    } catch (error) {
+      return { success: false, error: this.errorMessage(error) };
+    } finally {
+      await lines.return(undefined);
     }
   }
 
@@ -259,13 +401,10 @@ export class GoogleVerificationService {
     );
 
     try {
-      const { stdout, stderr } = await execFileAsync(
-        this.pythonPath,
-        [this.scriptPath, 'cancel', packageName, productId, purchaseToken],
-        {
-          timeout: 10000,
-          encoding: 'utf8',
-        },
+      const { stdout, stderr } = await this.runVerifier(
+        'cancel',
+        { packageName, productId, purchaseToken },
+        [packageName, productId, purchaseToken],
       );
 
       if (stderr) {
@@ -285,6 +424,39 @@ export class GoogleVerificationService {
     }
   }
 
+  /**
+   * Wait for a cancel the daemon queued (cancelSubscription returned
+   * `async: true`) and return its outcome. Never rejects: a job that cannot
+   * be read or does not finish in time is reported as a failure.
+   */
+  async waitForJob(jobId: string): Promise<GoogleCancelResult> {
+    const deadline = Date.now() + JOB_POLL_TIMEOUT_MS;
+
+    try {
+      while (Date.now() < deadline) {
+        const job = JSON.parse(
+          await this.requestJobStatus(jobId),
+        ) as GoogleJobStatusResponse;
+
+        if (!job.success) {
+          return { success: false, error: job.error || 'Unknown job' };
+        }
+        if (job.status === 'done' && job.result) {
+          return job.result;
+        }
+        await new Promise((resolve) =>
+          setTimeout(resolve, JOB_POLL_INTERVAL_MS),
+        );
+      }
+      return {
+        success: false,
+        error: `Verifier job ${jobId} did not finish in time`,
+      };
+    } catch (error) {
+      return { success: false, error: this.errorMessage(error) };
+    }
+  }
+
   /**
    * Acknowledge a Google Play purchase to prevent auto-refund after 3 days.
    */
@@ -309,20 +481,10 @@ export class GoogleVerificationService {
     );
 
     try {
-      const { stdout, stderr } = await execFileAsync(
-        this.pythonPath,
-        [
-          this.scriptPath,
-          'acknowledge',
-          ackType,
-          packageName,
-          productId,
-          purchaseToken,
-        ],
-        {
-          timeout: 10000,
-          encoding: 'utf8',
-        },
+      const { stdout, stderr } = await this.runVerifier(
+        'acknowledge',
+        { type: ackType, packageName, productId, purchaseToken },
+        [ackType, packageName, productId, purchaseToken],
       );
 
       if (stderr) {
@@ -344,6 +506,156 @@ export class GoogleVerificationService {
     }
   }
 
+  /**
+   * Run a verifier action on the Python daemon, falling back to a one-shot
+   * subprocess when the daemon socket is missing or refuses connections.
+   */
+  private async runVerifier(
+    action: VerifierAction,
+    payload: Record<string, string>,
+    cliArgs: string[],
+  ): Promise<{ stdout: string; stderr: string }> {
+    try {
+      const stdout = await this.requestDaemon(action, payload);
+      return { stdout, stderr: '' };
+    } catch (error) {
+      const code = (error as NodeJS.ErrnoException)?.code;
+      if (!code || !DAEMON_UNAVAILABLE_CODES.has(code)) {
+        throw error;
+      }
+      this.logger.debug(
+        `Verifier daemon unavailable (${code}), spawning script`,
+      );
+    }
+
+    // Using execFile with array arguments prevents command injection
+    return execFileAsync(
+      this.pythonPath,
+      [this.scriptPath, action, ...cliArgs],
+      {
+        timeout: VERIFIER_TIMEOUT_MS,
+        encoding: 'utf8',
+      },
+    );
+  }
+
+  /**
+   * Like runVerifier, but for actions that answer with newline-delimited JSON.
+   * Lines from the daemon are yielded as they arrive.
+   */
+  private async *streamVerifier(
+    action: VerifierAction,
+    payload: Record<string, string>,
+    cliArgs: string[],
+  ): AsyncGenerator<GoogleVerifierStreamLine> {
+    let res: http.IncomingMessage;
+    try {
+      res = await this.openDaemon(`/${action}`, payload);
+    } catch (error) {
+      const code = (error as NodeJS.ErrnoException)?.code;
+      if (!code || !DAEMON_UNAVAILABLE_CODES.has(code)) {
+        throw error;
+      }
+      this.logger.debug(
+        `Verifier daemon unavailable (${code}), spawning script`,
+      );
+
+      const { stdout } = await execFileAsync(
+        this.pythonPath,
+        [this.scriptPath, action, ...cliArgs],
+        {
+          timeout: VERIFIER_TIMEOUT_MS,
+          encoding: 'utf8',
+        },
+      );
+      for (const line of stdout.split('\n')) {
+        if (line.trim()) yield JSON.parse(line) as GoogleVerifierStreamLine;
+      }
+      return;
+    }
+
+    try {
+      let buffered = '';
+      res.setEncoding('utf8');
+      for await (const chunk of res as AsyncIterable<string>) {
+        buffered += chunk;
+        let newline: number;
+        while ((newline = buffered.indexOf('\n')) >= 0) {
+          const line = buffered.slice(0, newline).trim();
+          buffered = buffered.slice(newline + 1);
+          if (line) yield JSON.parse(line) as GoogleVerifierStreamLine;
+        }
+      }
+      if (buffered.trim()) {
+        yield JSON.parse(buffered) as GoogleVerifierStreamLine;
+      }
+    } finally {
+      // Only tear down the socket if we stopped reading early
+      if (!res.complete) res.destroy();
+    }
+  }
+
+  /** POST a JSON payload to the verifier daemon and collect the response body */
+  private async requestDaemon(
+    action: VerifierAction,
+    payload: Record<string, string>,
+  ): Promise<string> {
+    return this.readBody(await this.openDaemon(`/${action}`, payload));
+  }
+
+  /** Fetch a queued job's state from the verifier daemon */
+  private async requestJobStatus(jobId: string): Promise<string> {
+    return this.readBody(
+      await this.openDaemon(`/status/${encodeURIComponent(jobId)}`),
+    );
+  }
+
+  private readBody(res: http.IncomingMessage): Promise<string> {
+    return new Promise((resolve, reject) => {
+      let data = '';
+      res.setEncoding('utf8');
+      res.on('data', (chunk: string) => (data += chunk));
+      res.on('end', () => resolve(data));
+      res.on('error', reject);
+    });
+  }
+
+  /**
+   * Send a request to the verifier daemon over its Unix socket: a POST with
+   * a JSON payload, or a GET when there is no payload.
+   */
+  private openDaemon(
+    route: string,
+    payload?: Record<string, string>,
+  ): Promise<http.IncomingMessage> {
+    const body = payload ? JSON.stringify(payload) : undefined;
+
+    return new Promise((resolve, reject) => {
+      const req = http.request(
+        {
+          socketPath: this.socketPath,
+          path: route,
+          method: body ? 'POST' : 'GET',
+          agent: this.daemonAgent,
+          timeout: VERIFIER_TIMEOUT_MS,
+          headers: body
+            ? {
+                'Content-Type': 'application/json',
+                'Content-Length': Buffer.byteLength(body),
+              }
+            : undefined,
+        },
+        resolve,
+      );
+
+      req.on('timeout', () =>
+        req.destroy(new Error('Verifier daemon request timed out')),
+      );
+      req.on('error', reject);
+      req.end(body);
+    });
+  }
+
   private isSubscriptionActive(data: GoogleSubscriptionPurchase): boolean {
     const paymentState = data.paymentState;
     const cancelReason = data.cancelReason;
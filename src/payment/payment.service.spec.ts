@@ -28,9 +28,9 @@ describe('PaymentService', () => {
   let service: PaymentService;
   let mockPrisma: MockPrismaService;
   let mockGoogleVerification: {
-    verify: jest.Mock;
-    acknowledgePurchase: jest.Mock;
+    verifyAndAcknowledge: jest.Mock;
     cancelSubscription: jest.Mock;
+    waitForJob: jest.Mock;
   };
   let mockAppleVerification: {
     verify: jest.Mock;
@@ -41,9 +41,9 @@ describe('PaymentService', () => {
   beforeEach(async () => {
     mockPrisma = createMockPrismaService();
     mockGoogleVerification = {
-      verify: jest.fn(),
-      acknowledgePurchase: jest.fn().mockResolvedValue({ success: true }),
+      verifyAndAcknowledge: jest.fn(),
       cancelSubscription: jest.fn(),
+      waitForJob: jest.fn(),
     };
     mockAppleVerification = {
       verify: jest.fn(),
@@ -90,14 +90,16 @@ describe('PaymentService', () => {
       };
       const now = new Date();
 
-      mockGoogleVerification.verify.mockResolvedValue({
-        success: true,
-        isSubscription: true,
-        platformTxId: 'GPA.1234',
-        amount: 4.99,
-        currency: 'USD',
-        expirationTime: new Date(now.getTime() + 30 * 24 * 60 * 60 * 1000),
-        metadata: { acknowledgementState: 1 },
+      mockGoogleVerification.verifyAndAcknowledge.mockResolvedValue({
+        verification: {
+          success: true,
+          isSubscription: true,
+          platformTxId: 'GPA.1234',
+          amount: 4.99,
+          currency: 'USD',
+          expirationTime: new Date(now.getTime() + 30 * 24 * 60 * 60 * 1000),
+          metadata: { acknowledgementState: 1 },
+        },
       });
 
       mockPrisma.paymentTransaction.create.mockResolvedValue({
@@ -122,7 +124,9 @@ describe('PaymentService', () => {
 
       const result = await service.verifyPurchase(userId, dto);
 
-      expect(mockGoogleVerification.verify).toHaveBeenCalledWith({
+      expect(
+        mockGoogleVerification.verifyAndAcknowledge,
+      ).toHaveBeenCalledWith({
         purchaseToken: 'valid-token',
         productId: 'com.storytime.monthly',
         packageName: undefined,
@@ -132,6 +136,50 @@ describe('PaymentService', () => {
       expect(result.subscription?.plan).toBe('monthly');
     });
 
+    it('should not wait for the Google acknowledgement to settle', async () => {
+      const userId = 'user-1';
+      const dto = {
+        platform: 'google' as const,
+        productId: 'com.storytime.monthly',
+        purchaseToken: 'valid-token',
+      };
+      const now = new Date();
+
+      mockGoogleVerification.verifyAndAcknowledge.mockResolvedValue({
+        verification: {
+          success: true,
+          isSubscription: true,
+          platformTxId: 'GPA.5678',
+          amount: 4.99,
+          currency: 'USD',
+          expirationTime: new Date(now.getTime() + 30 * 24 * 60 * 60 * 1000),
+          metadata: { acknowledgementState: 0 },
+        },
+        acknowledgement: new Promise(() => undefined),
+      });
+      mockPrisma.paymentTransaction.create.mockResolvedValue({
+        id: 'tx-2',
+        userId,
+        amount: 4.99,
+        currency: 'USD',
+        status: 'success',
+        reference: 'hash-456',
+      });
+      mockPrisma.subscription.findFirst.mockResolvedValue(null);
+      mockPrisma.subscription.create.mockResolvedValue({
+        id: 'sub-2',
+        userId,
+        plan: 'monthly',
+        status: 'active',
+        startedAt: now,
+        endsAt: new Date(now.getTime() + 30 * 24 * 60 * 60 * 1000),
+      });
+
+      const result = await service.verifyPurchase(userId, dto);
+
+      expect(result.success).toBe(true);
+    });
+
     it('should verify Apple purchase and create subscription', async () => {
       const userId = 'user-1';
       const dto = {
@@ -187,10 +235,12 @@ describe('PaymentService', () => {
         purchaseToken: 'duplicate-token',
       };
 
-      mockGoogleVerification.verify.mockResolvedValue({
-        success: true,
-        isSubscription: true,
-        metadata: { acknowledgementState: 1 },
+      mockGoogleVerification.verifyAndAcknowledge.mockResolvedValue({
+        verification: {
+          success: true,
+          isSubscription: true,
+          metadata: { acknowledgementState: 1 },
+        },
       });
 
       // Simulate P2002 unique constraint violation on paymentTransaction.create
@@ -234,10 +284,12 @@ describe('PaymentService', () => {
         purchaseToken: 'reused-token',
       };
 
-      mockGoogleVerification.verify.mockResolvedValue({
-        success: true,
-        isSubscription: true,
-        metadata: { acknowledgementState: 1 },
+      mockGoogleVerification.verifyAndAcknowledge.mockResolvedValue({
+        verification: {
+          success: true,
+          isSubscription: true,
+          metadata: { acknowledgementState: 1 },
+        },
       });
 
       // Simulate P2002 unique constraint violation
@@ -283,7 +335,9 @@ describe('PaymentService', () => {
         purchaseToken: 'invalid-token',
       };
 
-      mockGoogleVerification.verify.mockResolvedValue({ success: false });
+      mockGoogleVerification.verifyAndAcknowledge.mockResolvedValue({
+        verification: { success: false },
+      });
 
       await expect(service.verifyPurchase(userId, dto)).rejects.toThrow(
         BadRequestException,
@@ -313,10 +367,12 @@ describe('PaymentService', () => {
         purchaseToken: 'valid-token',
       };
 
-      mockGoogleVerification.verify.mockResolvedValue({
-        success: true,
-        isSubscription: true,
-        metadata: { acknowledgementState: 1 },
+      mockGoogleVerification.verifyAndAcknowledge.mockResolvedValue({
+        verification: {
+          success: true,
+          isSubscription: true,
+          metadata: { acknowledgementState: 1 },
+        },
       });
 
       await expect(service.verifyPurchase(userId, dto)).rejects.toThrow(
@@ -333,13 +389,15 @@ describe('PaymentService', () => {
       };
       const now = new Date();
 
-      mockGoogleVerification.verify.mockResolvedValue({
-        success: true,
-        isSubscription: true,
-        amount: 47.99,
-        currency: 'USD',
-        expirationTime: new Date(now.getTime() + 365 * 24 * 60 * 60 * 1000),
-        metadata: { acknowledgementState: 1 },
+      mockGoogleVerification.verifyAndAcknowledge.mockResolvedValue({
+        verification: {
+          success: true,
+          isSubscription: true,
+          amount: 47.99,
+          currency: 'USD',
+          expirationTime: new Date(now.getTime() + 365 * 24 * 60 * 60 * 1000),
+          metadata: { acknowledgementState: 1 },
+        },
       });
 
       mockPrisma.paymentTransaction.create.mockResolvedValue({
@@ -492,6 +550,39 @@ describe('PaymentService', () => {
       });
     });
 
+    it('should follow up on a queued Google Play cancel', async () => {
+      const futureDate = new Date(Date.now() + 86400000 * 30);
+      const mockSub = {
+        id: 'sub-1',
+        plan: 'monthly',
+        status: 'active',
+        endsAt: futureDate,
+        platform: 'google',
+        productId: 'com.storytime.monthly',
+        purchaseToken: 'google-token-123',
+      };
+
+      mockPrisma.subscription.findFirst.mockResolvedValue(mockSub);
+      mockGoogleVerification.cancelSubscription.mockResolvedValue({
+        success: true,
+        async: true,
+        jobId: 'job-123',
+      });
+      mockGoogleVerification.waitForJob.mockResolvedValue({
+        success: false,
+        error: 'API error',
+      });
+      mockPrisma.subscription.update.mockResolvedValue({
+        ...mockSub,
+        status: 'cancelled',
+      });
+
+      const result = await service.cancelSubscription('u1');
+
+      expect(result.status).toBe('cancelled');
+      expect(mockGoogleVerification.waitForJob).toHaveBeenCalledWith('job-123');
+    });
+
     it('should still cancel locally if Google Play cancel fails', async () => {
       const futureDate = new Date(Date.now() + 86400000 * 30);
       const mockSub = {
@@ -70,42 +70,32 @@ export class PaymentService {
   }
 
   private async verifyGooglePurchase(userId: string, dto: VerifyPurchaseDto) {
-    const result = await this.googleVerificationService.verify({
-      purchaseToken: dto.purchaseToken,
-      productId: dto.productId,
-      packageName: dto.packageName,
-    });
+    // The verifier acknowledges not-yet-acknowledged purchases (to prevent
+    // auto-refund after 3 days) in the same call; we only wait for the
+    // verification and log the acknowledgement outcome when it arrives.
+    const { verification: result, acknowledgement } =
+      await this.googleVerificationService.verifyAndAcknowledge({
+        purchaseToken: dto.purchaseToken,
+        productId: dto.productId,
+        packageName: dto.packageName,
+      });
 
     if (!result.success) {
       throw new BadRequestException('Google Play purchase verification failed');
     }
 
-    // Acknowledge the purchase to prevent auto-refund after 3 days
-    const acknowledgementState = result.metadata?.acknowledgementState;
-    if (acknowledgementState !== 1) {
-      const configPackageName =
-        this.configService.get<string>('GOOGLE_PLAY_PACKAGE_NAME') || '';
-      const packageName = (dto.packageName || configPackageName).trim();
-
-      const ackResult =
-        await this.googleVerificationService.acknowledgePurchase(
-          {
-            packageName,
-            productId: dto.productId,
-            purchaseToken: dto.purchaseToken,
-          },
-          result.isSubscription ?? true,
-        );
-
-      if (!ackResult.success) {
-        this.logger.warn(
-          `Google Play acknowledgement failed for user ${userId.substring(0, 8)}: ${ackResult.error ?? 'unknown'}. Purchase is valid but must be acknowledged within 3 days.`,
-        );
-      } else {
-        this.logger.log(
-          `Google Play purchase acknowledged for user ${userId.substring(0, 8)}`,
-        );
-      }
+    if (acknowledgement) {
+      void acknowledgement.then((ackResult) => {
+        if (!ackResult.success) {
+          this.logger.warn(
+            `Google Play acknowledgement failed for user ${userId.substring(0, 8)}: ${ackResult.error ?? 'unknown'}. Purchase is valid but must be acknowledged within 3 days.`,
+          );
+        } else {
+          this.logger.log(
+            `Google Play purchase acknowledged for user ${userId.substring(0, 8)}`,
+          );
+        }
+      });
     }
 
     const plan = this.mapProductIdToPlan(dto.productId);
@@ -363,6 +353,24 @@ export class PaymentService {
             this.logger.warn(
               `Google Play cancellation failed for user ${userId.substring(0, 8)}: ${cancelResult.error ?? 'unknown error'}. Proceeding with local cancel.`,
             );
+          } else if (cancelResult.async && cancelResult.jobId) {
+            this.logger.log(
+              `Google Play cancellation queued for user ${userId.substring(0, 8)} (job ${cancelResult.jobId})`,
+            );
+            // The local cancel does not wait on Google; surface the outcome
+            void this.googleVerificationService
+              .waitForJob(cancelResult.jobId)
+              .then((jobResult) => {
+                if (!jobResult.success) {
+                  this.logger.warn(
+                    `Google Play cancellation failed for user ${userId.substring(0, 8)}: ${jobResult.error ?? 'unknown error'}. Subscription was cancelled locally only.`,
+                  );
+                } else {
+                  this.logger.log(
+                    `Google Play subscription cancelled for user ${userId.substring(0, 8)}`,
+                  );
+                }
+              });
           } else {
             this.logger.log(
               `Google Play subscription cancelled for user ${userId.substring(0, 8)}`,